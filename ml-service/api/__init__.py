@@ -1,7 +1,88 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from config import config
+import logging
+import logging.handlers
 import os
+import queue
+import threading
+
+# orjson is optional; stdlib json is used when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson's C serializer.
+
+    OPT_SERIALIZE_NUMPY lets handlers return numpy scalars/arrays
+    without per-value float()/tolist() round-trips.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# Guards model construction so gunicorn --preload / threaded servers
+# never build (and joblib.load) the same model twice
+_warmup_lock = threading.Lock()
+
+def configure_logging(app):
+    """Route the app logger through a queue so log IO never blocks
+    request threads.
+
+    Handlers only enqueue records; a background QueueListener does the
+    actual (unbuffered) stderr writes.
+    """
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+    ))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+
+    app.logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    app.logger.setLevel(logging.INFO)
+
+def warmup_models(app):
+    """Eagerly construct all ML models and stash them on the app.
+
+    Loading the models at startup instead of on first request removes the
+    cold-start latency spike and keeps exactly one instance of each model
+    per process.
+    """
+    from models.expense_classifier import ExpenseClassifier
+    from models.anomaly_detector import AnomalyDetector
+    from models.cashflow_predictor import CashFlowPredictor
+    from models.health_scorer import FinancialHealthScorer
+
+    from api.batcher import DynamicBatcher
+
+    with _warmup_lock:
+        if 'ml_models' not in app.extensions:
+            classifier = ExpenseClassifier()
+            detector = AnomalyDetector()
+
+            app.extensions['ml_models'] = {
+                'expense_classifier': classifier,
+                'anomaly_detector': detector,
+                'cashflow_predictor': CashFlowPredictor(),
+                'health_scorer': FinancialHealthScorer()
+            }
+
+            # Batch concurrent requests into single model calls
+            app.extensions['ml_batchers'] = {
+                'categorize': DynamicBatcher(classifier.predict_batch),
+                'detect_anomaly': DynamicBatcher(detector.detect_batch)
+            }
 
 def create_app(config_name=None):
     """Application factory pattern"""
@@ -11,6 +92,13 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+
+    # Non-blocking logging for the request path
+    configure_logging(app)
+
+    # Fast JSON (de)serialization for the large expense payloads
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Initialize directories
     config[config_name].init_app()
@@ -27,6 +115,9 @@ def create_app(config_name=None):
     # Register blueprints
     from api.routes import ml_bp
     app.register_blueprint(ml_bp, url_prefix='/ml')
+
+    # Load all models once at startup (thread-safe)
+    warmup_models(app)
     
     # Health check route
     @app.route('/health')
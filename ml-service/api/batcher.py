@@ -0,0 +1,62 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config import Config
+
+class DynamicBatcher:
+    """
+    Batches concurrent requests into a single model call
+
+    Handlers submit one payload each; a background thread collects
+    pending payloads (up to max_batch, waiting at most max_wait_ms for
+    stragglers) and hands them to process_batch in one shot, so the
+    vectorized NumPy/sklearn work is amortized across callers.
+    """
+
+    def __init__(self, process_batch, max_batch=None, max_wait_ms=None):
+        """
+        Args:
+            process_batch (callable): Takes a list of payloads, returns
+                a list of results in the same order
+            max_batch (int): Maximum payloads per batch
+            max_wait_ms (int): Maximum time to wait for more payloads
+        """
+        self.process_batch = process_batch
+        self.max_batch = max_batch or Config.BATCH_SIZE
+        self.max_wait = (max_wait_ms or Config.BATCH_TIMEOUT_MS) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, payload):
+        """Enqueue a payload and block until its result is available"""
+        future = Future()
+        self._queue.put((payload, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            # Collect stragglers until the batch is full or time is up
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            payloads = [payload for payload, _ in batch]
+            try:
+                results = self.process_batch(payloads)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
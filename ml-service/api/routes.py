@@ -1,41 +1,37 @@
-from flask import Blueprint, request, jsonify
-from models.expense_classifier import ExpenseClassifier
-from models.anomaly_detector import AnomalyDetector
-from models.cashflow_predictor import CashFlowPredictor
-from models.health_scorer import FinancialHealthScorer
-import traceback
+from flask import Blueprint, request, jsonify, current_app
+from api.schemas import expenses_decoder
+from models.anomaly_detector import ModelNotReadyError
+from functools import lru_cache
+import msgspec
 
 ml_bp = Blueprint('ml', __name__)
 
-# Initialize models (lazy loading)
-expense_classifier = None
-anomaly_detector = None
-cashflow_predictor = None
-health_scorer = None
+# Models are constructed once at startup by api.warmup_models() and
+# shared via app.extensions['ml_models']
 
 def get_expense_classifier():
-    global expense_classifier
-    if expense_classifier is None:
-        expense_classifier = ExpenseClassifier()
-    return expense_classifier
+    return current_app.extensions['ml_models']['expense_classifier']
 
 def get_anomaly_detector():
-    global anomaly_detector
-    if anomaly_detector is None:
-        anomaly_detector = AnomalyDetector()
-    return anomaly_detector
+    return current_app.extensions['ml_models']['anomaly_detector']
 
 def get_cashflow_predictor():
-    global cashflow_predictor
-    if cashflow_predictor is None:
-        cashflow_predictor = CashFlowPredictor()
-    return cashflow_predictor
+    return current_app.extensions['ml_models']['cashflow_predictor']
 
 def get_health_scorer():
-    global health_scorer
-    if health_scorer is None:
-        health_scorer = FinancialHealthScorer()
-    return health_scorer
+    return current_app.extensions['ml_models']['health_scorer']
+
+# Metrics the health scorer consumes, in cache-key order
+HEALTH_METRIC_KEYS = (
+    'cash_reserves', 'monthly_revenue', 'monthly_expenses',
+    'burn_rate', 'runway_months', 'growth_rate', 'debt_ratio'
+)
+
+@lru_cache(maxsize=1024)
+def _cached_health_score(metrics_key):
+    """Memoized scoring: dashboards refresh identical metrics often"""
+    metrics = dict(zip(HEALTH_METRIC_KEYS, metrics_key))
+    return get_health_scorer().calculate_score(metrics)
 
 @ml_bp.route('/health', methods=['GET'])
 def health():
@@ -75,8 +71,7 @@ def categorize_expense():
         if 'title' not in data:
             return jsonify({'error': 'Title is required'}), 400
         
-        classifier = get_expense_classifier()
-        result = classifier.predict(data)
+        result = current_app.extensions['ml_batchers']['categorize'].submit(data)
         
         return jsonify({
             'category': result['category'],
@@ -84,9 +79,12 @@ def categorize_expense():
             'alternatives': result.get('alternatives', [])
         })
         
+    except (ValueError, KeyError) as e:
+        # Expected bad-input errors: no stack capture on this path
+        current_app.logger.warning('Bad request in categorize_expense: %s', e)
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in categorize_expense: {str(e)}")
-        traceback.print_exc()
+        current_app.logger.exception('Error in categorize_expense')
         return jsonify({'error': str(e)}), 500
 
 @ml_bp.route('/detect-anomaly', methods=['POST'])
@@ -109,13 +107,11 @@ def detect_anomalies():
     }
     """
     try:
-        data = request.get_json()
-        
-        if not data or 'expenses' not in data:
+        try:
+            expenses = expenses_decoder.decode(request.get_data()).expenses
+        except msgspec.DecodeError:
             return jsonify({'error': 'Expenses array is required'}), 400
-        
-        expenses = data['expenses']
-        
+
         if len(expenses) < 10:
             return jsonify({
                 'anomalies': [],
@@ -126,17 +122,20 @@ def detect_anomalies():
                 }
             })
         
-        detector = get_anomaly_detector()
-        result = detector.detect(expenses)
+        result = current_app.extensions['ml_batchers']['detect_anomaly'].submit(expenses)
         
         return jsonify({
             'anomalies': result['anomalies'],
             'summary': result['summary']
         })
-        
+
+    except ModelNotReadyError as e:
+        return jsonify({'error': 'model_not_ready', 'message': str(e)}), 503
+    except (ValueError, KeyError) as e:
+        current_app.logger.warning('Bad request in detect_anomalies: %s', e)
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in detect_anomalies: {str(e)}")
-        traceback.print_exc()
+        current_app.logger.exception('Error in detect_anomalies')
         return jsonify({'error': str(e)}), 500
 
 @ml_bp.route('/predict-cashflow', methods=['POST'])
@@ -181,9 +180,11 @@ def predict_cashflow():
             'metrics': result.get('metrics', {})
         })
         
+    except (ValueError, KeyError) as e:
+        current_app.logger.warning('Bad request in predict_cashflow: %s', e)
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in predict_cashflow: {str(e)}")
-        traceback.print_exc()
+        current_app.logger.exception('Error in predict_cashflow')
         return jsonify({'error': str(e)}), 500
 
 @ml_bp.route('/financial-health', methods=['POST'])
@@ -208,8 +209,11 @@ def financial_health():
         if not data:
             return jsonify({'error': 'Financial metrics are required'}), 400
         
-        scorer = get_health_scorer()
-        result = scorer.calculate_score(data)
+        # Round to cents so float noise doesn't defeat the cache
+        metrics_key = tuple(
+            round(float(data.get(k, 0)), 2) for k in HEALTH_METRIC_KEYS
+        )
+        result = _cached_health_score(metrics_key)
         
         return jsonify({
             'score': result['score'],
@@ -218,9 +222,11 @@ def financial_health():
             'recommendations': result['recommendations']
         })
         
+    except (ValueError, KeyError) as e:
+        current_app.logger.warning('Bad request in financial_health: %s', e)
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in financial_health: {str(e)}")
-        traceback.print_exc()
+        current_app.logger.exception('Error in financial_health')
         return jsonify({'error': str(e)}), 500
 
 @ml_bp.route('/analyze-patterns', methods=['POST'])
@@ -242,15 +248,14 @@ def analyze_patterns():
     }
     """
     try:
-        data = request.get_json()
-        
-        if not data or 'expenses' not in data:
+        try:
+            expenses = expenses_decoder.decode(request.get_data()).expenses
+        except msgspec.DecodeError:
             return jsonify({'error': 'Expenses array is required'}), 400
-        
+
         # For now, return basic pattern analysis
         # This can be enhanced with actual ML models
-        expenses = data['expenses']
-        
+
         # Simple pattern analysis
         patterns = analyze_expense_patterns(expenses)
         
@@ -260,33 +265,39 @@ def analyze_patterns():
             'insights': patterns['insights']
         })
         
+    except (ValueError, KeyError) as e:
+        current_app.logger.warning('Bad request in analyze_patterns: %s', e)
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in analyze_patterns: {str(e)}")
-        traceback.print_exc()
+        current_app.logger.exception('Error in analyze_patterns')
         return jsonify({'error': str(e)}), 500
 
 def analyze_expense_patterns(expenses):
-    """Helper function for basic pattern analysis"""
-    from collections import defaultdict
-    import statistics
-    
-    category_totals = defaultdict(float)
-    monthly_totals = defaultdict(float)
-    
-    for exp in expenses:
-        category_totals[exp.get('category', 'Other')] += exp['amount']
-        month = exp['date'][:7] if 'date' in exp else 'Unknown'
-        monthly_totals[month] += exp['amount']
-    
+    """Helper function for basic pattern analysis over Expense structs"""
+    import numpy as np
+
+    amounts = np.fromiter(
+        (exp.amount for exp in expenses),
+        dtype=np.float64, count=len(expenses)
+    )
+
+    # Group sums in C via unique + bincount instead of a Python
+    # dict-accumulation loop over every expense
+    categories = [exp.category for exp in expenses]
+    cats, cat_inverse = np.unique(categories, return_inverse=True)
+    category_totals = np.bincount(cat_inverse, weights=amounts)
+
+    months = [exp.date[:7] if exp.date else 'Unknown' for exp in expenses]
+    month_totals = np.bincount(
+        np.unique(months, return_inverse=True)[1], weights=amounts
+    )
+
     # Find top categories
-    top_categories = sorted(
-        category_totals.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
+    top_order = np.argsort(category_totals)[::-1][:5]
+    top_categories = [(cats[i], category_totals[i]) for i in top_order]
+
     # Calculate monthly average
-    monthly_avg = statistics.mean(monthly_totals.values()) if monthly_totals else 0
+    monthly_avg = float(month_totals.mean()) if len(month_totals) else 0
     
     return {
         'patterns': {
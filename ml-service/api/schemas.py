@@ -0,0 +1,18 @@
+import msgspec
+
+class Expense(msgspec.Struct):
+    """One expense row as sent by the backend"""
+    amount: float
+    id: str = ''
+    category: str = 'Unknown'
+    date: str = ''
+    description: str = ''
+    department: str = ''
+
+class ExpensesRequest(msgspec.Struct):
+    """Request body shared by /ml/detect-anomaly and /ml/analyze-patterns"""
+    expenses: list[Expense]
+
+# Reusable decoder: parses request bytes straight into typed structs,
+# skipping the intermediate dict-of-dicts that get_json() would build
+expenses_decoder = msgspec.json.Decoder(ExpensesRequest)
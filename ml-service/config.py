@@ -18,13 +18,20 @@ class Config:
     
     # Model files
     EXPENSE_CLASSIFIER_MODEL = os.path.join(MODEL_PATH, 'expense_classifier.pkl')
+    EXPENSE_CLASSIFIER_TREELITE = os.path.join(MODEL_PATH, 'expense_classifier_rf.so')
     VECTORIZER_MODEL = os.path.join(MODEL_PATH, 'vectorizer.pkl')
     ANOMALY_DETECTOR_MODEL = os.path.join(MODEL_PATH, 'anomaly_detector.pkl')
+    ANOMALY_DETECTOR_ONNX = os.path.join(MODEL_PATH, 'anomaly_detector.onnx')
+    ANOMALY_DETECTOR_TREELITE = os.path.join(MODEL_PATH, 'anomaly_detector_iforest.so')
     CASHFLOW_MODEL = os.path.join(MODEL_PATH, 'cashflow_model.pkl')
     
     # ML Settings
     ANOMALY_THRESHOLD = float(os.getenv('ANOMALY_THRESHOLD', 2.5))
     PREDICTION_CONFIDENCE_MIN = 0.6
+
+    # Request batching
+    BATCH_SIZE = int(os.getenv('BATCH_SIZE', 64))
+    BATCH_TIMEOUT_MS = int(os.getenv('BATCH_TIMEOUT_MS', 20))
     
     # Categories for expense classification
     EXPENSE_CATEGORIES = [
@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for the ML service
+
+Run with: gunicorn -c gunicorn.conf.py "api:create_app()"
+
+gevent workers keep request/response I/O concurrent while numpy/sklearn
+C calls release the GIL, so CPU-bound inference and socket handling
+coexist within a worker.
+"""
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', 8000)}"
+
+# The gevent worker monkey-patches the stdlib itself during worker
+# init (post-fork), so no explicit patch_all() hook is needed here
+worker_class = "gevent"
+workers = int(os.getenv("WORKERS", (os.cpu_count() or 1) * 2 + 1))
+worker_connections = 1000
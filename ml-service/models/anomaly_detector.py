@@ -1,25 +1,66 @@
 import numpy as np
-import pandas as pd
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from config import Config
+from utils.dates import parse_iso_bulk
 import joblib
 import os
 
+# ONNX export/inference is optional; fall back to sklearn when missing
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    ort = None
+
+# Treelite compilation is optional too; it beats ONNX by compiling the
+# forest to a native shared library with batched SIMD tree traversal
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    treelite = None
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when detection is requested before a model was trained"""
+
 class AnomalyDetector:
     """
     Detects unusual or anomalous expenses using Isolation Forest
     """
-    
+
+    # Column index for each known category's one-hot feature
+    CAT_INDEX = {cat: i for i, cat in enumerate(Config.EXPENSE_CATEGORIES)}
+
+    # amount, log1p(amount), day of month, day of week, month
+    NUM_BASE_FEATURES = 5
+
     def __init__(self):
         self.model = IsolationForest(
+            n_estimators=100,
+            max_samples=256,    # Bounded subsample: constant-time scoring
             contamination=0.1,  # Expect 10% anomalies
+            n_jobs=-1,          # Parallelize fit/scoring across cores
             random_state=42
         )
-        self.scaler = StandardScaler()
+        # copy=False: scale the freshly built float32 matrix in place
+        self.scaler = StandardScaler(copy=False)
         self.threshold = Config.ANOMALY_THRESHOLD
         self.model_path = Config.ANOMALY_DETECTOR_MODEL
-        
+        self.onnx_path = Config.ANOMALY_DETECTOR_ONNX
+        self.treelite_path = Config.ANOMALY_DETECTOR_TREELITE
+
+        # Compiled inference backends, preferred over sklearn in the
+        # order treelite > ONNX
+        self._predictor = None
+        self._session = None
+
+        # Scaler statistics as plain arrays, so transforms skip
+        # sklearn's per-call input validation
+        self._scaler_mean = None
+        self._scaler_inv_scale = None
+
         # Try to load existing model
         self.load_model()
     
@@ -28,7 +69,7 @@ class AnomalyDetector:
         Detect anomalies in a list of expenses
         
         Args:
-            expenses (list): List of expense dictionaries
+            expenses (list): List of Expense structs (see api.schemas)
         
         Returns:
             dict: Anomalies detected with scores and reasons
@@ -42,40 +83,200 @@ class AnomalyDetector:
                     'message': 'Need at least 10 expenses for detection'
                 }
             }
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(expenses)
-        
-        # Feature engineering
-        features = self._prepare_features(df)
-        
-        # Fit model if not already trained
-        if not hasattr(self.model, 'offset_'):
-            scaled_features = self.scaler.fit_transform(features)
-            self.model.fit(scaled_features)
-            self.save_model()
+
+        return self.detect_batch([expenses])[0]
+
+    def detect_batch(self, batches):
+        """
+        Detect anomalies for several expense lists in one scoring pass
+
+        Feature matrices from all callers are concatenated so the scaler
+        and Isolation Forest run once per batch instead of once per
+        request, then results are split back per caller.
+
+        Args:
+            batches (list): List of expense lists
+
+        Returns:
+            list: One result dict per input expense list
+        """
+        # Serving never fits or touches disk; train offline with
+        # scripts/train_anomaly.py
+        if not self.is_ready:
+            raise ModelNotReadyError(
+                'Anomaly detector has not been trained yet; '
+                'run scripts/train_anomaly.py'
+            )
+
+        # Feature engineering over the whole batch (fixed-width matrix,
+        # so rows from different callers can be stacked directly)
+        all_expenses = [exp for batch in batches for exp in batch]
+        features = self._prepare_features(all_expenses)
+
+        # Scale in place on the freshly built float32 matrix, keeping
+        # the whole scoring path float32
+        if self._scaler_mean is not None:
+            scaled_features = self._fast_transform(features)
         else:
             scaled_features = self.scaler.transform(features)
-        
-        # Predict anomalies (-1 for anomalies, 1 for normal)
-        predictions = self.model.predict(scaled_features)
-        
-        # Get anomaly scores (lower is more anomalous)
+
+        predictions, scores = self._score(scaled_features)
+
+        # Split results back per caller
+        results = []
+        offset = 0
+        for expenses in batches:
+            n = len(expenses)
+            results.append(self._build_result(
+                expenses,
+                predictions[offset:offset + n],
+                scores[offset:offset + n]
+            ))
+            offset += n
+
+        return results
+
+    @property
+    def is_ready(self):
+        """Whether a trained model is available for scoring"""
+        return hasattr(self.model, 'offset_')
+
+    def fit(self, expenses):
+        """
+        Fit the scaler and forest on historical expenses and persist
+        all model artifacts (pickle, ONNX, Treelite library)
+
+        Meant to be run offline (scripts/train_anomaly.py), never from
+        the request path.
+
+        Args:
+            expenses (list): List of Expense structs (see api.schemas)
+        """
+        features = self._prepare_features(expenses)
+        scaled_features = self.scaler.fit_transform(features)
+        self._cache_scaler_stats()
+        self.model.fit(scaled_features)
+        self._export_onnx(features.shape[1])
+        self._compile_treelite()
+        self.save_model()
+
+    def _cache_scaler_stats(self):
+        """Cache the fitted scaler's statistics as plain float32 arrays"""
+        self._scaler_mean = self.scaler.mean_.astype(np.float32)
+        self._scaler_inv_scale = np.reciprocal(
+            self.scaler.scale_).astype(np.float32)
+
+    def _fast_transform(self, X):
+        """
+        Standardize X in place using the cached statistics
+
+        Equivalent to self.scaler.transform(X) but skips sklearn's
+        per-call input validation and stays float32 throughout.
+        """
+        X -= self._scaler_mean
+        X *= self._scaler_inv_scale
+        return X
+
+    def _score(self, scaled_features):
+        """
+        Run the Isolation Forest over scaled features
+
+        Prefers the Treelite-compiled kernel, then the ONNX session,
+        and falls back to the sklearn estimator otherwise.
+
+        Returns:
+            tuple: (predictions (-1/1), anomaly scores per sample)
+        """
+        if self._predictor is not None:
+            out = self._predictor.predict(
+                tl2cgen.DMatrix(scaled_features.astype(np.float32, copy=False))
+            )
+            # Treelite emits -score_samples; threshold at offset_ the
+            # same way sklearn's predict does
+            scores = -out.ravel()
+            predictions = np.where(scores < self.model.offset_, -1, 1)
+            return predictions, scores
+
+        if self._session is not None:
+            labels, decision = self._session.run(
+                None, {'X': scaled_features.astype(np.float32, copy=False)}
+            )
+            # ONNX 'scores' is decision_function; shift back to
+            # score_samples so downstream severity logic is unchanged
+            return labels.ravel(), decision.ravel() + self.model.offset_
+
+        # Get anomaly scores (lower is more anomalous) in a single
+        # traversal; predict() would just rerun score_samples and
+        # threshold at offset_, so derive the labels directly
         scores = self.model.score_samples(scaled_features)
-        
-        # Identify anomalies
+        predictions = np.where(scores < self.model.offset_, -1, 1)
+
+        return predictions, scores
+
+    def _compile_treelite(self):
+        """Compile the fitted forest to a native shared library"""
+        if treelite is None:
+            return
+        try:
+            model = treelite.sklearn.import_model(self.model)
+            tl2cgen.export_lib(
+                model,
+                toolchain='gcc',
+                libpath=self.treelite_path,
+                params={'parallel_comp': 4}
+            )
+            self._predictor = tl2cgen.Predictor(self.treelite_path)
+            print(f"Anomaly detector compiled to {self.treelite_path}")
+        except Exception as e:
+            print(f"Error compiling anomaly detector with Treelite: {e}")
+            self._predictor = None
+
+    def _export_onnx(self, n_features):
+        """Convert the fitted sklearn model to an ONNX inference session"""
+        if ort is None:
+            return
+        try:
+            onx = convert_sklearn(
+                self.model,
+                initial_types=[('X', FloatTensorType([None, n_features]))],
+                target_opset={'': 18, 'ai.onnx.ml': 3}
+            )
+            with open(self.onnx_path, 'wb') as f:
+                f.write(onx.SerializeToString())
+            self._session = ort.InferenceSession(
+                self.onnx_path, providers=['CPUExecutionProvider']
+            )
+            print(f"Anomaly detector exported to {self.onnx_path}")
+        except Exception as e:
+            print(f"Error exporting anomaly detector to ONNX: {e}")
+            self._session = None
+
+    def _build_result(self, expenses, predictions, scores):
+        """Assemble the anomaly list and summary for one expense list"""
+        # Per-category and overall amount statistics, computed once so
+        # the reason check per anomaly is an O(1) dict lookup
+        amounts = np.fromiter(
+            (exp.amount for exp in expenses),
+            dtype=np.float64, count=len(expenses)
+        )
+        cat_stats = self._category_stats(expenses, amounts)
+        overall_mean = amounts.mean()
+        overall_std = amounts.std(ddof=1)
+
         anomalies = []
         for idx, (pred, score) in enumerate(zip(predictions, scores)):
             if pred == -1:
                 expense = expenses[idx]
-                reason = self._determine_anomaly_reason(expense, df, idx)
+                reason = self._determine_anomaly_reason(
+                    expense, cat_stats, overall_mean, overall_std
+                )
                 
                 anomalies.append({
-                    'expense_id': expense.get('id', idx),
-                    'amount': expense['amount'],
-                    'category': expense.get('category', 'Unknown'),
-                    'date': expense.get('date', ''),
-                    'description': expense.get('description', ''),
+                    'expense_id': expense.id or idx,
+                    'amount': expense.amount,
+                    'category': expense.category,
+                    'date': expense.date,
+                    'description': expense.description,
                     'anomaly_score': float(abs(score)),
                     'reason': reason,
                     'severity': self._get_severity(score)
@@ -94,51 +295,65 @@ class AnomalyDetector:
             }
         }
     
-    def _prepare_features(self, df):
-        """Prepare features for anomaly detection"""
-        features = pd.DataFrame()
-        
-        # Amount-based features
-        features['amount'] = df['amount']
-        features['amount_log'] = np.log1p(df['amount'])
-        
-        # Category encoding (if available)
-        if 'category' in df.columns:
-            category_dummies = pd.get_dummies(df['category'], prefix='cat')
-            features = pd.concat([features, category_dummies], axis=1)
-        
-        # Date-based features (if available)
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            features['day_of_month'] = df['date'].dt.day
-            features['day_of_week'] = df['date'].dt.dayofweek
-            features['month'] = df['date'].dt.month
-        
-        # Fill NaN values
-        features = features.fillna(0)
-        
-        return features
+    def _prepare_features(self, expenses):
+        """
+        Build the feature matrix for anomaly detection
+
+        Returns a fixed-width float32 array (amount, log1p(amount),
+        day of month, day of week, month, one-hot category over
+        Config.EXPENSE_CATEGORIES) built directly from the expense
+        structs, avoiding pandas object overhead on small batches.
+        """
+        n = len(expenses)
+        X = np.zeros((n, self.NUM_BASE_FEATURES + len(self.CAT_INDEX)),
+                     dtype=np.float32)
+
+        X[:, 0] = np.fromiter(
+            (exp.amount for exp in expenses), dtype=np.float32, count=n
+        )
+        np.log1p(np.maximum(X[:, 0], 0), out=X[:, 1])
+        X[:, 2:5] = parse_iso_bulk([exp.date for exp in expenses])
+
+        for i, exp in enumerate(expenses):
+            cat_idx = self.CAT_INDEX.get(exp.category)
+            if cat_idx is not None:
+                X[i, self.NUM_BASE_FEATURES + cat_idx] = 1
+
+        return X
     
-    def _determine_anomaly_reason(self, expense, df, idx):
+    @staticmethod
+    def _category_stats(expenses, amounts):
+        """Compute per-category (mean, std, count) of amounts in one pass"""
+        categories = [exp.category for exp in expenses]
+        cats, inverse = np.unique(categories, return_inverse=True)
+
+        counts = np.bincount(inverse)
+        means = np.bincount(inverse, weights=amounts) / counts
+
+        # Sample std (ddof=1), matching the previous per-group .std()
+        sq_sums = np.bincount(inverse, weights=amounts * amounts)
+        variance = (sq_sums - counts * means * means) / np.maximum(counts - 1, 1)
+        stds = np.sqrt(np.maximum(variance, 0))
+
+        return {
+            cat: (means[i], stds[i], counts[i])
+            for i, cat in enumerate(cats)
+        }
+
+    def _determine_anomaly_reason(self, expense, cat_stats, overall_mean, overall_std):
         """Determine why an expense is considered anomalous"""
         reasons = []
-        
-        amount = expense['amount']
-        category = expense.get('category', 'Unknown')
-        
-        # Check if amount is unusually high
-        category_expenses = df[df.get('category', pd.Series()) == category]['amount']
-        if len(category_expenses) > 1:
-            mean = category_expenses.mean()
-            std = category_expenses.std()
-            
+
+        amount = expense.amount
+        category = expense.category
+
+        # Check if amount is unusually high for its category
+        mean, std, count = cat_stats.get(category, (0, 0, 0))
+        if count > 1:
             if amount > mean + 2 * std:
                 reasons.append(f"Amount ${amount:.2f} is significantly higher than category average ${mean:.2f}")
-        
+
         # Check overall amount distribution
-        overall_mean = df['amount'].mean()
-        overall_std = df['amount'].std()
-        
         if amount > overall_mean + 3 * overall_std:
             reasons.append(f"Extremely high amount compared to overall spending pattern")
         
@@ -181,6 +396,14 @@ class AnomalyDetector:
                 data = joblib.load(self.model_path)
                 self.model = data['model']
                 self.scaler = data['scaler']
+                if hasattr(self.scaler, 'mean_'):
+                    self._cache_scaler_stats()
+                if treelite is not None and os.path.exists(self.treelite_path):
+                    self._predictor = tl2cgen.Predictor(self.treelite_path)
+                if ort is not None and os.path.exists(self.onnx_path):
+                    self._session = ort.InferenceSession(
+                        self.onnx_path, providers=['CPUExecutionProvider']
+                    )
                 print("Anomaly detector loaded successfully!")
                 return True
         except Exception as e:
@@ -1,13 +1,115 @@
+import bisect
+import math
 import numpy as np
 from config import Config
 
+# numba is optional; when installed, batch scoring runs as a compiled
+# parallel kernel instead of chained NumPy array ops
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Threshold ladders as lookup tables: searchsorted picks the score
+# band branchlessly and vectorizes over arrays of metrics.
+# '>= threshold' ladders index with side='right' (count of
+# thresholds <= x), '<= threshold' ladders with side='left'.
+# Module-level so the numba kernel can bake them in as constants.
+_CASH_THRESHOLDS = np.array([1.0, 3.0, 6.0, 12.0])
+_CASH_SCORES = np.array([20, 40, 60, 80, 100])
+_BURN_THRESHOLDS = np.array([0.0, 0.2, 0.5, 1.0])
+_BURN_SCORES = np.array([100, 90, 70, 50, 30])
+_RUNWAY_THRESHOLDS = np.array([3.0, 6.0, 12.0, 24.0])
+_RUNWAY_SCORES = np.array([20, 40, 60, 80, 100])
+_GROWTH_THRESHOLDS = np.array([-0.1, 0.0, 0.1, 0.2, 0.3])
+_GROWTH_SCORES = np.array([20, 40, 60, 75, 90, 100])
+_EXPENSE_THRESHOLDS = np.array([0.5, 0.7, 0.9, 1.0])
+_EXPENSE_SCORES = np.array([100, 80, 60, 40, 20])
+
+# Letter grade ladder as a bisect table over score cut-offs
+_GRADE_THRESHOLDS = [40, 50, 55, 60, 65, 70, 75, 80, 85, 90]
+_GRADES = ['F', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _score_kernel(metrics, weight_vec):
+        """Compiled scoring core over a (n, 6) metrics array with
+        columns (cash, revenue, expenses, burn, runway, growth);
+        returns (component score matrix, overall scores)"""
+        n = metrics.shape[0]
+        components = np.empty((n, 6))
+        overall = np.empty(n)
+        for i in prange(n):
+            cash = metrics[i, 0]
+            revenue = metrics[i, 1]
+            expenses = metrics[i, 2]
+            burn = metrics[i, 3]
+            runway = metrics[i, 4]
+            growth = metrics[i, 5]
+
+            if expenses == 0.0:
+                cash_score = 50.0
+            else:
+                cash_score = _CASH_SCORES[np.searchsorted(
+                    _CASH_THRESHOLDS, cash / expenses, side='right')]
+
+            if revenue == 0.0:
+                burn_score = 30.0 if burn == 0.0 else 20.0
+                expense_score = 30.0
+            else:
+                burn_score = _BURN_SCORES[np.searchsorted(
+                    _BURN_THRESHOLDS, burn / revenue, side='left')]
+                expense_score = _EXPENSE_SCORES[np.searchsorted(
+                    _EXPENSE_THRESHOLDS, expenses / revenue, side='left')]
+
+            runway_score = _RUNWAY_SCORES[np.searchsorted(
+                _RUNWAY_THRESHOLDS, runway, side='right')]
+            growth_score = _GROWTH_SCORES[np.searchsorted(
+                _GROWTH_THRESHOLDS, growth, side='right')]
+            trend_score = 70.0
+
+            components[i, 0] = cash_score
+            components[i, 1] = burn_score
+            components[i, 2] = runway_score
+            components[i, 3] = growth_score
+            components[i, 4] = expense_score
+            components[i, 5] = trend_score
+
+            total = 0.0
+            for j in range(6):
+                total += components[i, j] * weight_vec[j]
+            overall[i] = np.round(total, 1)
+        return components, overall
+
 class FinancialHealthScorer:
     """
     Calculates overall financial health score based on multiple metrics
     """
-    
+
+    CASH_THRESHOLDS = _CASH_THRESHOLDS
+    CASH_SCORES = _CASH_SCORES
+    BURN_THRESHOLDS = _BURN_THRESHOLDS
+    BURN_SCORES = _BURN_SCORES
+    RUNWAY_THRESHOLDS = _RUNWAY_THRESHOLDS
+    RUNWAY_SCORES = _RUNWAY_SCORES
+    GROWTH_THRESHOLDS = _GROWTH_THRESHOLDS
+    GROWTH_SCORES = _GROWTH_SCORES
+    EXPENSE_THRESHOLDS = _EXPENSE_THRESHOLDS
+    EXPENSE_SCORES = _EXPENSE_SCORES
+
     def __init__(self):
         self.weights = Config.HEALTH_SCORE_WEIGHTS
+
+        # Fixed component order with the weights as a vector, so the
+        # overall score is one dot product instead of six dict lookups
+        # plus Python multiply/adds
+        self._score_order = (
+            'cash_reserves', 'burn_rate', 'runway',
+            'growth_rate', 'expense_ratio', 'revenue_trend'
+        )
+        self._weight_vec = np.array(
+            [self.weights[k] for k in self._score_order]
+        )
     
     def calculate_score(self, metrics):
         """
@@ -31,7 +133,7 @@ class FinancialHealthScorer:
         recommendations = []
         
         # 1. Cash Reserves Score (0-100)
-        cash_score = self._score_cash_reserves(
+        cash_score, cash_months = self._score_cash_reserves(
             metrics.get('cash_reserves', 0),
             metrics.get('monthly_expenses', 1)
         )
@@ -57,7 +159,7 @@ class FinancialHealthScorer:
         scores['growth_rate'] = growth_score
         
         # 5. Expense Ratio Score (0-100)
-        expense_ratio_score = self._score_expense_ratio(
+        expense_ratio_score, expense_ratio = self._score_expense_ratio(
             metrics.get('monthly_expenses', 0),
             metrics.get('monthly_revenue', 1)
         )
@@ -67,23 +169,22 @@ class FinancialHealthScorer:
         revenue_trend_score = 70  # Default score, can be calculated with historical data
         scores['revenue_trend'] = revenue_trend_score
         
-        # Calculate weighted overall score
-        overall_score = (
-            cash_score * self.weights['cash_reserves'] +
-            burn_score * self.weights['burn_rate'] +
-            runway_score * self.weights['runway'] +
-            growth_score * self.weights['growth_rate'] +
-            expense_ratio_score * self.weights['expense_ratio'] +
-            revenue_trend_score * self.weights['revenue_trend']
+        # Calculate weighted overall score as one dot product
+        score_vec = np.fromiter(
+            (scores[k] for k in self._score_order),
+            dtype=np.float64, count=len(self._score_order)
         )
-        
-        overall_score = round(overall_score, 1)
+        overall_score = round(float(score_vec @ self._weight_vec), 1)
         
         # Determine grade
         grade = self._get_grade(overall_score)
         
-        # Generate insights
-        insights = self._generate_insights(metrics, scores)
+        # Generate insights, reusing the ratios computed during scoring
+        ratios = {
+            'cash_months': cash_months,
+            'expense_ratio': expense_ratio
+        }
+        insights = self._generate_insights(metrics, scores, ratios)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(metrics, scores, overall_score)
@@ -97,119 +198,156 @@ class FinancialHealthScorer:
         }
     
     def _score_cash_reserves(self, cash, monthly_expenses):
-        """Score based on months of runway from cash reserves"""
+        """Score based on months of runway from cash reserves
+
+        Returns (score, months of coverage) so callers can reuse the
+        ratio without dividing again.
+        """
+        # Degenerate zero-expense case: fixed score and an unbounded
+        # runway marker, so no epsilon-divided number leaks to insights
         if monthly_expenses == 0:
-            return 50
-        
+            return 50, float('inf') if cash > 0 else 0.0
+
         months_coverage = cash / monthly_expenses
-        
-        if months_coverage >= 12:
-            return 100
-        elif months_coverage >= 6:
-            return 80
-        elif months_coverage >= 3:
-            return 60
-        elif months_coverage >= 1:
-            return 40
-        else:
-            return 20
-    
+
+        return int(self.CASH_SCORES[np.searchsorted(
+            self.CASH_THRESHOLDS, months_coverage, side='right')]), months_coverage
+
     def _score_burn_rate(self, burn_rate, monthly_revenue):
         """Score based on burn rate relative to revenue"""
         if monthly_revenue == 0:
             return 30 if burn_rate == 0 else 20
-        
+
         burn_ratio = burn_rate / monthly_revenue
-        
-        if burn_ratio <= 0:
-            return 100  # Profitable
-        elif burn_ratio <= 0.2:
-            return 90
-        elif burn_ratio <= 0.5:
-            return 70
-        elif burn_ratio <= 1.0:
-            return 50
-        else:
-            return 30
-    
+        return int(self.BURN_SCORES[np.searchsorted(
+            self.BURN_THRESHOLDS, burn_ratio, side='left')])
+
     def _score_runway(self, runway_months):
         """Score based on months of runway"""
-        if runway_months >= 24:
-            return 100
-        elif runway_months >= 12:
-            return 80
-        elif runway_months >= 6:
-            return 60
-        elif runway_months >= 3:
-            return 40
-        else:
-            return 20
-    
+        return int(self.RUNWAY_SCORES[np.searchsorted(
+            self.RUNWAY_THRESHOLDS, runway_months, side='right')])
+
     def _score_growth(self, growth_rate):
         """Score based on growth rate"""
-        if growth_rate >= 0.3:  # 30%+ growth
-            return 100
-        elif growth_rate >= 0.2:  # 20%+ growth
-            return 90
-        elif growth_rate >= 0.1:  # 10%+ growth
-            return 75
-        elif growth_rate >= 0:   # Positive growth
-            return 60
-        elif growth_rate >= -0.1:  # Small decline
-            return 40
-        else:
-            return 20
-    
+        return int(self.GROWTH_SCORES[np.searchsorted(
+            self.GROWTH_THRESHOLDS, growth_rate, side='right')])
+
     def _score_expense_ratio(self, expenses, revenue):
-        """Score based on expense to revenue ratio"""
+        """Score based on expense to revenue ratio
+
+        Returns (score, ratio) so callers can reuse the ratio without
+        dividing again.
+        """
+        ratio = expenses / max(revenue, 1e-9)
         if revenue == 0:
-            return 30
-        
-        ratio = expenses / revenue
-        
-        if ratio <= 0.5:  # 50% or less
-            return 100
-        elif ratio <= 0.7:  # 70% or less
-            return 80
-        elif ratio <= 0.9:  # 90% or less
-            return 60
-        elif ratio <= 1.0:  # Break even
-            return 40
-        else:
-            return 20
+            return 30, ratio
+
+        return int(self.EXPENSE_SCORES[np.searchsorted(
+            self.EXPENSE_THRESHOLDS, ratio, side='left')]), ratio
+
+    def calculate_score_batch(self, metrics_list):
+        """
+        Score many metric dicts in one vectorized pass
+
+        Runs every threshold lookup and the weighted sum as array ops
+        across all rows (portfolio or what-if sweeps); skips the
+        per-row insight and recommendation generation.
+
+        Args:
+            metrics_list (list): List of metric dicts as in
+                calculate_score
+
+        Returns:
+            list: One dict per input with score, grade and
+                component_scores
+        """
+        def col(key, default=0):
+            return np.array(
+                [m.get(key, default) for m in metrics_list],
+                dtype=np.float64
+            )
+
+        cash = col('cash_reserves')
+        revenue = col('monthly_revenue')
+        expenses = col('monthly_expenses')
+        burn = col('burn_rate')
+        runway = col('runway_months')
+        growth = col('growth_rate')
+
+        if njit is not None:
+            metrics_arr = np.stack(
+                [cash, revenue, expenses, burn, runway, growth], axis=1
+            )
+            component_matrix, overall = _score_kernel(
+                metrics_arr, self._weight_vec
+            )
+            return self._batch_results(component_matrix, overall)
+
+        coverage = cash / np.maximum(expenses, 1e-9)
+        cash_scores = np.where(
+            expenses == 0, 50,
+            self.CASH_SCORES[np.searchsorted(
+                self.CASH_THRESHOLDS, coverage, side='right')]
+        )
+
+        burn_ratio = burn / np.maximum(revenue, 1e-9)
+        burn_scores = np.where(
+            revenue == 0, np.where(burn == 0, 30, 20),
+            self.BURN_SCORES[np.searchsorted(
+                self.BURN_THRESHOLDS, burn_ratio, side='left')]
+        )
+
+        runway_scores = self.RUNWAY_SCORES[np.searchsorted(
+            self.RUNWAY_THRESHOLDS, runway, side='right')]
+        growth_scores = self.GROWTH_SCORES[np.searchsorted(
+            self.GROWTH_THRESHOLDS, growth, side='right')]
+
+        expense_ratio = expenses / np.maximum(revenue, 1e-9)
+        expense_scores = np.where(
+            revenue == 0, 30,
+            self.EXPENSE_SCORES[np.searchsorted(
+                self.EXPENSE_THRESHOLDS, expense_ratio, side='left')]
+        )
+
+        trend_scores = np.full(len(metrics_list), 70.0)
+
+        component_matrix = np.stack([
+            cash_scores, burn_scores, runway_scores,
+            growth_scores, expense_scores, trend_scores
+        ], axis=1).astype(np.float64)
+        overall = np.round(component_matrix @ self._weight_vec, 1)
+
+        return self._batch_results(component_matrix, overall)
+
+    def _batch_results(self, component_matrix, overall):
+        """Build per-row result dicts from batch scoring arrays"""
+        return [
+            {
+                'score': float(score),
+                'grade': self._get_grade(score),
+                'component_scores': dict(
+                    zip(self._score_order, (int(c) for c in row))
+                )
+            }
+            for score, row in zip(overall, component_matrix)
+        ]
     
     def _get_grade(self, score):
         """Convert score to letter grade"""
-        if score >= 90:
-            return 'A+'
-        elif score >= 85:
-            return 'A'
-        elif score >= 80:
-            return 'A-'
-        elif score >= 75:
-            return 'B+'
-        elif score >= 70:
-            return 'B'
-        elif score >= 65:
-            return 'B-'
-        elif score >= 60:
-            return 'C+'
-        elif score >= 55:
-            return 'C'
-        elif score >= 50:
-            return 'C-'
-        elif score >= 40:
-            return 'D'
-        else:
-            return 'F'
+        return _GRADES[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
     
-    def _generate_insights(self, metrics, scores):
-        """Generate key insights from the data"""
+    def _generate_insights(self, metrics, scores, ratios):
+        """Generate key insights from precomputed scores and ratios"""
         insights = []
-        
+
         # Cash reserves insight
-        cash_months = metrics.get('cash_reserves', 0) / metrics.get('monthly_expenses', 1)
-        if cash_months < 3:
+        cash_months = ratios['cash_months']
+        if math.isinf(cash_months):
+            insights.append({
+                'type': 'positive',
+                'message': 'Strong cash position: no monthly expenses recorded'
+            })
+        elif cash_months < 3:
             insights.append({
                 'type': 'warning',
                 'message': f'Low cash reserves: Only {cash_months:.1f} months of runway'
@@ -234,7 +372,7 @@ class FinancialHealthScorer:
             })
         
         # Expense ratio insight
-        expense_ratio = metrics.get('monthly_expenses', 0) / metrics.get('monthly_revenue', 1)
+        expense_ratio = ratios['expense_ratio']
         if expense_ratio > 1.0:
             insights.append({
                 'type': 'critical',
@@ -2,23 +2,52 @@
 """
 ML Service Runner
 Starts the Flask ML API service
+
+Debug runs use Werkzeug's dev server; otherwise the app is served by
+an embedded gunicorn. Each worker builds its own app after fork: the
+batcher worker threads and the logging queue listener don't survive
+fork(), so a preloaded app would leave every worker with dead threads.
+The mmap-loaded model arrays are still shared between workers through
+the page cache.
 """
 
 from api import create_app
+from config import config
 import os
 
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+class GunicornApp(BaseApplication if BaseApplication else object):
+    """Embedded gunicorn building the Flask app per worker, post-fork"""
+
+    def __init__(self, app_factory, options):
+        self.app_factory = app_factory
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Called in each worker after fork, so the app's background
+        # threads (batchers, log listener) belong to the worker process
+        return self.app_factory()
+
 if __name__ == '__main__':
     # Get configuration from environment
     config_name = os.getenv('FLASK_ENV', 'development')
-    
-    # Create app
-    app = create_app(config_name)
-    
-    # Get port from config
-    port = app.config.get('PORT', 8000)
-    host = app.config.get('HOST', '0.0.0.0')
-    debug = app.config.get('DEBUG', True)
-    
+
+    # Read settings off the config class; the app itself is only
+    # created where it will actually serve requests
+    cfg = config.get(config_name, config['default'])
+    port = cfg.PORT
+    host = cfg.HOST
+    debug = cfg.DEBUG
+
     print(f"""
 ╔═══════════════════════════════════════════╗
 ║   ML Service Starting                      ║
@@ -29,10 +58,20 @@ if __name__ == '__main__':
 ║   Debug: {str(debug):<29} ║
 ╚═══════════════════════════════════════════╝
     """)
-    
+
     # Run the app
-    app.run(
-        host=host,
-        port=port,
-        debug=debug
-    )
+    if debug or BaseApplication is None:
+        # Dev server: single process, auto-reload
+        app = create_app(config_name)
+        app.run(
+            host=host,
+            port=port,
+            debug=debug
+        )
+    else:
+        GunicornApp(lambda: create_app(config_name), {
+            'bind': f'{host}:{port}',
+            'workers': int(os.getenv('WORKERS', (os.cpu_count() or 1) * 2 + 1)),
+            'worker_class': 'gevent',
+            'worker_connections': 1000,
+        }).run()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Offline trainer for the anomaly detector
+
+Fits the Isolation Forest on historical expenses and writes all model
+artifacts to saved_models/, so serving workers never pay fit or disk
+I/O costs. The service returns 503 until this has been run once.
+
+Usage:
+    python scripts/train_anomaly.py expenses.json
+
+where expenses.json contains {"expenses": [...]} in the same shape as
+the /ml/detect-anomaly request body.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.schemas import expenses_decoder
+from config import Config
+from models.anomaly_detector import AnomalyDetector
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Train the anomaly detector on historical expenses'
+    )
+    parser.add_argument(
+        'expenses_file',
+        help='JSON file with {"expenses": [...]}'
+    )
+    args = parser.parse_args()
+
+    with open(args.expenses_file, 'rb') as f:
+        expenses = expenses_decoder.decode(f.read()).expenses
+
+    if len(expenses) < 10:
+        sys.exit('Need at least 10 expenses to train the anomaly detector')
+
+    Config.init_app()
+    detector = AnomalyDetector()
+    detector.fit(expenses)
+    print(f"Anomaly detector trained on {len(expenses)} expenses")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Date parsing helpers shared by the ML models
+
+datetime.fromisoformat is an order of magnitude cheaper than
+pd.to_datetime's format inference for the ISO strings the backend
+sends, which matters inside feature-preparation hot loops.
+"""
+import numpy as np
+from datetime import date, datetime
+
+def parse_iso_bulk(values):
+    """
+    Parse ISO date strings into an (n, 3) int16 matrix
+
+    Columns are (day of month, day of week, month); rows that fail to
+    parse are left as zeros.
+    """
+    out = np.zeros((len(values), 3), dtype=np.int16)
+    fromisoformat = date.fromisoformat
+
+    for i, value in enumerate(values):
+        try:
+            parsed = fromisoformat(str(value)[:10])
+        except ValueError:
+            continue
+        out[i, 0] = parsed.day
+        out[i, 1] = parsed.weekday()
+        out[i, 2] = parsed.month
+
+    return out
+
+def parse_iso_datetimes(values):
+    """Parse ISO date/datetime strings into a list of datetime objects"""
+    fromisoformat = datetime.fromisoformat
+    return [fromisoformat(str(value)[:19]) for value in values]